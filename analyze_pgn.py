@@ -0,0 +1,409 @@
+"""Bulk PGN analysis – annotate every game with blunders and missed tactics.
+
+    python analyze_pgn.py games/*.pgn -o analysis --workers 4
+
+Games are streamed one at a time with ``chess.pgn.read_game`` (files are never
+loaded whole).  Positions are deduplicated and fanned out to a process pool;
+each worker owns its own Stockfish instance, or falls back to a material
+minimax when no engine is available.  Results are appended incrementally to
+``<out>.pgn`` (annotated games) and ``<out>.jsonl`` (one record per game).
+
+Re-running the same command resumes: games already present in ``<out>.jsonl``
+are skipped, and any half-written tail of either file is trimmed first.  An
+existing ``<out>.pgn`` without its checkpoint is never overwritten unless
+``--fresh`` is given.  Variants other than standard chess and Chess960, and
+games that fail to analyse, are recorded with a ``skipped`` reason instead of
+aborting the run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+import chess
+import chess.pgn
+from chess.engine import EngineError, Limit, SimpleEngine
+
+from material_search import MATE_SCORE, evaluate_material, search_best
+
+# --- Constants --------------------------------------------------------------
+BLUNDER_CP = 300       # centipawns lost versus the best move
+MISTAKE_CP = 150
+TACTIC_CP = 200        # best move gains this much over the material count
+CACHE_SIZE = 200_000   # evaluated positions kept for deduplication
+PROGRESS_EVERY = 2.0   # seconds between progress lines
+
+Evaluation = Tuple[int, Optional[str]]  # (score for side to move, best move UCI)
+
+
+# --- Worker process ---------------------------------------------------------
+
+_engine: Optional[SimpleEngine] = None
+_limit = Limit(depth=12)
+_fallback_depth = 2
+
+
+def _quit_engine(engine: SimpleEngine) -> None:
+    try:
+        engine.quit()
+    except EngineError:
+        pass  # already gone, e.g. after Ctrl-C
+
+
+def probe_engine(engine_path: str) -> Optional[str]:
+    """Return the engine's name, or None if it cannot be started as a UCI engine."""
+    try:
+        engine = SimpleEngine.popen_uci(engine_path)
+    except Exception:
+        return None
+    name = engine.id.get("name", os.path.basename(engine_path))
+    _quit_engine(engine)
+    return name
+
+
+def _init_worker(engine_path: Optional[str], depth: int, fallback_depth: int) -> None:
+    """Pool initializer: open one engine per worker process."""
+    global _engine, _limit, _fallback_depth
+    # Ctrl-C is handled by the main process; workers and engines must not see it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _limit = Limit(depth=depth)
+    _fallback_depth = fallback_depth
+    if not engine_path:
+        return
+    # The engine was probed already, so a failure here breaks the pool loudly
+    # instead of silently downgrading to the minimax.
+    _engine = SimpleEngine.popen_uci(engine_path, setpgrp=True)
+    # Pool workers skip atexit handlers, but multiprocessing finalizers run.
+    Finalize(_engine, _quit_engine, args=(_engine,), exitpriority=10)
+
+
+def analyze_position(fen: str, chess960: bool = False) -> Evaluation:
+    """Evaluate one position. Runs inside a pool worker."""
+    board = chess.Board(fen, chess960=chess960)
+    if board.is_game_over():
+        return (-MATE_SCORE if board.is_checkmate() else 0), None
+
+    if _engine:
+        try:
+            info = _engine.analyse(board, _limit)
+            score = info["score"].pov(board.turn).score(mate_score=MATE_SCORE)
+            pv = info.get("pv")
+            return score, pv[0].uci() if pv else None
+        except Exception:
+            pass  # If engine fails, fall back
+
+    score, best = search_best(board, _fallback_depth)
+    return score, best.uci() if best else None
+
+
+# --- Annotation -------------------------------------------------------------
+
+Position = Tuple[str, str, bool]  # (dedup key, FEN, chess960)
+
+
+def game_positions(game: chess.pgn.Game) -> List[Position]:
+    """Return the position before every move plus the final one.
+
+    Raises ValueError for variants other than standard chess / Chess960 and
+    for an unparsable ``[FEN]`` header.
+    """
+    board = game.board()
+    if board.uci_variant != "chess":
+        raise ValueError(f"unsupported variant: {board.uci_variant}")
+
+    def position() -> Position:
+        # Castling rights mean different moves in Chess960, so keep the keys apart.
+        key = board.epd() + (" 960" if board.chess960 else "")
+        return key, board.fen(), board.chess960
+
+    positions = [position()]
+    for move in game.mainline_moves():
+        board.push(move)
+        positions.append(position())
+    return positions
+
+
+def annotate_game(game: chess.pgn.Game, evals: List[Evaluation]) -> dict:
+    """Add NAGs/comments to `game` in place and return a JSON-ready summary."""
+    board = game.board()
+    moves = []
+    counts = {"blunder": 0, "mistake": 0, "missed_tactic": 0}
+
+    for ply, node in enumerate(game.mainline()):
+        move = node.move
+        best_score, best_uci = evals[ply]
+        played_score = -evals[ply + 1][0]
+        loss = max(0, best_score - played_score)
+        best = chess.Move.from_uci(best_uci) if best_uci else None
+
+        tags = []
+        if best and best != move:
+            if loss >= BLUNDER_CP:
+                tags.append("blunder")
+                node.nags.add(chess.pgn.NAG_BLUNDER)
+            elif loss >= MISTAKE_CP:
+                tags.append("mistake")
+                node.nags.add(chess.pgn.NAG_MISTAKE)
+
+            material = evaluate_material(board)
+            material = material if board.turn == chess.WHITE else -material
+            forcing = board.is_capture(best) or board.gives_check(best)
+            if forcing and loss >= TACTIC_CP and best_score - material >= TACTIC_CP:
+                tags.append("missed_tactic")
+
+        entry = {
+            "ply": ply + 1,
+            "san": board.san(move),
+            "uci": move.uci(),
+            "score": played_score,
+            "best": best_uci,
+            "loss": loss,
+            "tags": tags,
+        }
+        if tags:
+            for tag in tags:
+                counts[tag] += 1
+            best_san = board.san(best)
+            label = ", ".join(t.replace("_", " ") for t in tags).capitalize()
+            node.comment = f"{label} ({-loss / 100:+.2f}). Best was {best_san} ({best_score / 100:+.2f})."
+            entry["best_san"] = best_san
+        moves.append(entry)
+        board.push(move)
+
+    return {
+        "headers": {k: game.headers.get(k, "?") for k in ("Event", "Date", "White", "Black", "Result")},
+        "errors": [str(e) for e in game.errors],
+        **counts,
+        "moves": moves,
+    }
+
+
+# --- Streaming / resume -----------------------------------------------------
+
+def iter_games(paths: List[str], done: Set[Tuple[str, int]]) -> Iterator[Tuple[str, int, chess.pgn.Game]]:
+    """Yield (path, index, game) for every game not already in `done`.
+
+    `done` holds (realpath, index) so ``games.pgn`` and ``./games.pgn`` match.
+    """
+    for path in paths:
+        source_id = os.path.realpath(path)
+        with open(path, "r", encoding="utf-8-sig", errors="replace") as handle:
+            index = 0
+            while True:
+                if (source_id, index) in done:
+                    if not chess.pgn.skip_game(handle):
+                        break
+                else:
+                    game = chess.pgn.read_game(handle)
+                    if game is None:
+                        break
+                    yield path, index, game
+                index += 1
+
+
+def _trim_to_last_line(path: str, chunk_size: int = 64 * 1024) -> None:
+    """Drop a partial trailing line left by an interrupted write.
+
+    Scans backwards from the end so large outputs are never read whole.
+    """
+    with open(path, "rb+") as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            start = max(0, pos - chunk_size)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            if pos == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+def load_checkpoint(json_path: str, pgn_path: str) -> Set[Tuple[str, int]]:
+    """Return finished (path, index) keys and trim both outputs to a consistent state."""
+    done: Set[Tuple[str, int]] = set()
+    if not os.path.exists(json_path):
+        return done
+
+    pgn_end = 0
+    _trim_to_last_line(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            done.add((os.path.realpath(record["source"]), record["index"]))
+            pgn_end = max(pgn_end, record["pgn_end"])
+    if os.path.exists(pgn_path):
+        # Games written to the PGN after the last JSON record are redone.
+        with open(pgn_path, "rb+") as f:
+            if pgn_end < f.seek(0, os.SEEK_END):
+                f.truncate(pgn_end)
+    return done
+
+
+class Progress:
+    """Periodic progress / throughput line on stderr."""
+
+    def __init__(self, skipped: int):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.skipped = skipped
+        self.games = 0
+        self.positions = 0
+        self.analyzed = 0
+        self.cached = 0
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last < PROGRESS_EVERY:
+            return
+        self.last = now
+        elapsed = max(now - self.start, 1e-9)
+        print(
+            f"[{elapsed:7.1f}s] {self.games} games ({self.skipped} resumed) | "
+            f"{self.positions} positions, {self.analyzed} analysed, {self.cached} deduplicated | "
+            f"{self.analyzed / elapsed:.1f} pos/s, {self.games / elapsed:.2f} games/s",
+            file=sys.stderr,
+        )
+
+
+# --- Pipeline ---------------------------------------------------------------
+
+def run(args: argparse.Namespace) -> None:
+    pgn_path = args.output + ".pgn"
+    json_path = args.output + ".jsonl"
+    for out in (pgn_path, json_path):
+        if os.path.exists(out) and any(os.path.samefile(out, src) for src in args.pgn):
+            sys.exit(f"error: output '{out}' is also an input file – choose another -o prefix.")
+    if args.fresh:
+        for path in (pgn_path, json_path):
+            if os.path.exists(path):
+                os.remove(path)
+    elif os.path.exists(pgn_path) and not os.path.exists(json_path):
+        sys.exit(f"error: '{pgn_path}' exists but has no '{json_path}' checkpoint to resume from – "
+                 f"pass --fresh to overwrite it.")
+    done = load_checkpoint(json_path, pgn_path)
+
+    engine_path = None if args.no_engine else args.engine
+    engine_name = probe_engine(engine_path) if engine_path else None
+    if engine_path and not engine_name:
+        print(f"Engine '{engine_path}' could not be started as a UCI engine – "
+              f"using depth-{args.fallback_depth} minimax.", file=sys.stderr)
+        engine_path = None
+    if engine_name:
+        evaluator = f"{engine_name} depth {args.depth}"
+    else:
+        evaluator = f"minimax depth {args.fallback_depth}"
+
+    cache: "OrderedDict[str, Evaluation]" = OrderedDict()
+    pending: Dict[str, Future] = {}
+    # (path, index, game, positions or None when skipped, skip reason)
+    window: Deque[Tuple[str, int, chess.pgn.Game, Optional[List[Position]], Optional[str]]] = deque()
+    progress = Progress(skipped=len(done))
+
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(engine_path, args.depth, args.fallback_depth),
+    )
+
+    def submit(key: str, fen: str, chess960: bool) -> None:
+        progress.positions += 1
+        if key in cache:
+            cache.move_to_end(key)
+            progress.cached += 1
+        elif key in pending:
+            progress.cached += 1
+        else:
+            pending[key] = pool.submit(analyze_position, fen, chess960)
+
+    def resolve(key: str, fen: str, chess960: bool) -> Evaluation:
+        if key in cache:
+            return cache[key]
+        future = pending.pop(key, None) or pool.submit(analyze_position, fen, chess960)  # evicted meanwhile
+        result = future.result()
+        progress.analyzed += 1
+        cache[key] = result
+        if len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+
+    def flush_oldest(pgn_out, json_out) -> None:
+        path, index, game, positions, reason = window.popleft()
+        record = {"source": path, "index": index, "evaluator": evaluator}
+        if positions is not None:
+            try:
+                evals = [resolve(*position) for position in positions]
+                record.update(annotate_game(game, evals))
+            except BrokenExecutor:
+                raise
+            except Exception as exc:  # one bad game must not end the run
+                reason = f"{type(exc).__name__}: {exc}"
+        if reason:
+            record["skipped"] = reason
+            print(f"Skipping {path} game #{index + 1}: {reason}", file=sys.stderr)
+        else:
+            pgn_out.write((str(game) + "\n\n").encode("utf-8"))
+            pgn_out.flush()
+        record["pgn_end"] = pgn_out.tell()
+        json_out.write(json.dumps(record) + "\n")
+        json_out.flush()
+        progress.games += 1
+        progress.report()
+
+    try:
+        with open(pgn_path, "ab") as pgn_out, open(json_path, "a", encoding="utf-8") as json_out:
+            for path, index, game in iter_games(args.pgn, done):
+                positions, reason = None, None
+                try:
+                    positions = game_positions(game)
+                except Exception as exc:  # bad [FEN] header, unsupported variant, ...
+                    reason = f"{type(exc).__name__}: {exc}"
+                if positions:
+                    for position in positions:
+                        submit(*position)
+                window.append((path, index, game, positions, reason))
+                # Keep several games in flight so workers stay busy while we write.
+                while len(window) > args.window:
+                    flush_oldest(pgn_out, json_out)
+            while window:
+                flush_oldest(pgn_out, json_out)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        progress.report(force=True)
+        print("Interrupted – rerun the same command to resume.", file=sys.stderr)
+        sys.exit(130)
+
+    pool.shutdown()
+    progress.report(force=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Annotate PGN games with blunders and missed tactics.")
+    parser.add_argument("pgn", nargs="+", help="PGN file(s) to analyse")
+    parser.add_argument("-o", "--output", default="analysis", help="output prefix for .pgn/.jsonl (default: analysis)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--window", type=int, default=None, help="games kept in flight (default: 4 × workers)")
+    parser.add_argument("--engine", default=os.getenv("STOCKFISH_PATH", "stockfish"), help="UCI engine binary")
+    parser.add_argument("--no-engine", action="store_true", help="use the built-in minimax only")
+    parser.add_argument("--depth", type=int, default=12, help="engine search depth")
+    parser.add_argument("--fallback-depth", type=int, default=2, help="minimax depth without engine")
+    parser.add_argument("--fresh", action="store_true", help="discard previous output instead of resuming")
+    args = parser.parse_args(argv)
+    if args.window is None:
+        args.window = 4 * args.workers
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
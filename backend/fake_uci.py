@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Minimal fake UCI engine for offline, deterministic load tests.
+
+Point the backend at it with ``STOCKFISH_PATH=backend/fake_uci.py``.  Every
+``go`` sleeps for a configurable latency and then plays a legal move chosen
+deterministically from the position, so repeated runs behave identically.
+
+Environment:
+    FAKE_UCI_LATENCY_MS   mean think time per move (default 50)
+    FAKE_UCI_JITTER_MS    +/- uniform jitter around the mean (default 0)
+    FAKE_UCI_SEED         seed mixed into move/latency choice (default 0)
+"""
+import os
+import random
+import sys
+import time
+from typing import Optional, Tuple
+
+import chess
+
+LATENCY_MS = float(os.getenv("FAKE_UCI_LATENCY_MS", "50"))
+JITTER_MS = float(os.getenv("FAKE_UCI_JITTER_MS", "0"))
+SEED = os.getenv("FAKE_UCI_SEED", "0")
+
+
+def send(line: str) -> None:
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def set_position(tokens: list[str]) -> chess.Board:
+    """Parse the arguments of a UCI ``position`` command."""
+    if tokens[0] == "startpos":
+        board = chess.Board()
+        rest = tokens[1:]
+    else:  # "fen" + 6 fields
+        board = chess.Board(" ".join(tokens[1:7]))
+        rest = tokens[7:]
+    if rest and rest[0] == "moves":
+        for uci in rest[1:]:
+            board.push_uci(uci)
+    return board
+
+
+def pick_move(board: chess.Board, seed: str = SEED, latency_ms: float = LATENCY_MS,
+              jitter_ms: float = JITTER_MS) -> Tuple[Optional[chess.Move], float]:
+    """Return (move, delay in ms) for `board`; also used by the load test to verify the engine."""
+    # Seeding with a string is stable across processes (unlike hash()).
+    rng = random.Random(f"{seed}:{board.fen()}")
+    delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms))
+    moves = sorted(board.legal_moves, key=chess.Move.uci)
+    return (rng.choice(moves) if moves else None), delay
+
+
+def think(board: chess.Board) -> None:
+    move, delay = pick_move(board)
+    time.sleep(delay / 1000)
+    if move is None:
+        send("info depth 1 score cp 0")
+        send("bestmove 0000")
+        return
+    send("info depth 1 score cp 0 pv " + move.uci())
+    send("bestmove " + move.uci())
+
+
+def main() -> None:
+    board = chess.Board()
+    for raw in sys.stdin:
+        tokens = raw.split()
+        if not tokens:
+            continue
+        cmd = tokens[0]
+        if cmd == "uci":
+            send("id name FakeUCI")
+            send("id author ChessTutor")
+            # The backend configures this option; python-chess rejects unknown ones.
+            send("option name Skill Level type spin default 20 min 0 max 20")
+            send("uciok")
+        elif cmd == "isready":
+            send("readyok")
+        elif cmd == "ucinewgame":
+            board = chess.Board()
+        elif cmd == "position":
+            board = set_position(tokens[1:])
+        elif cmd == "go":
+            think(board)
+        elif cmd == "quit":
+            break
+        # setoption / stop / debug etc. are accepted silently
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Asyncio load generator for ``/api/move``.
+
+    python -m backend.loadtest --concurrency 1,4,16,64 --duration 10
+
+By default a local ``uvicorn backend.server:app`` is started with
+``STOCKFISH_PATH`` pointing at ``backend/fake_uci.py``, so runs are offline and
+deterministic (tune the engine with ``--engine-latency-ms`` / ``--engine-jitter-ms``).
+Pass ``--url`` to hit an already running server instead.
+
+Each virtual user replays games from ``start_positions.json``: it picks a
+position, plays seeded-random legal moves and follows the server's replies
+until the game ends or ``--max-plies`` is reached.  For every concurrency
+stage RPS, p50/p95/p99 latency (over all requests, failures and timeouts
+included) and the error rate are reported.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import chess
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_ENGINE = os.path.join(BASE_DIR, "backend", "fake_uci.py")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (seconds) in milliseconds."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1] * 1000
+
+
+@dataclass
+class StageResult:
+    concurrency: int
+    duration: float = 0.0
+    # Seconds per request, failures and timeouts included: leaving them out
+    # would hide exactly the slowest requests once the server saturates.
+    latencies: List[float] = field(default_factory=list)
+    error_latencies: List[float] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def errors(self) -> int:
+        return len(self.error_latencies)
+
+    def percentile(self, pct: float) -> float:
+        return percentile(self.latencies, pct)
+
+    def summary(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "rps": self.requests / self.duration if self.duration else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "error_p99_ms": percentile(self.error_latencies, 99),
+        }
+
+
+# --- Virtual user -----------------------------------------------------------
+
+async def virtual_user(client: httpx.AsyncClient, positions: List[Dict], rng: random.Random,
+                       deadline: float, max_plies: int, result: StageResult) -> None:
+    """Replay games back to back until `deadline`."""
+    while time.perf_counter() < deadline:
+        start = rng.choice(positions)
+        fen = start["fen"]
+        legal = [m.uci() for m in chess.Board(fen).legal_moves]
+        for _ in range(max_plies):
+            if not legal or time.perf_counter() >= deadline:
+                break
+            move = rng.choice(sorted(legal))
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post("/api/move", json={"fen": fen, "move": move})
+                data = resp.json() if resp.status_code == 200 else None
+            except (httpx.HTTPError, ValueError):
+                data = None
+            elapsed = time.perf_counter() - t0
+            result.latencies.append(elapsed)
+            if not data or not data.get("ok"):
+                result.error_latencies.append(elapsed)
+                break  # start a fresh game after a failure
+            fen = data["fen"]
+            legal = data["legal_moves"]
+
+
+async def run_stage(url: str, positions: List[Dict], concurrency: int, duration: float,
+                    max_plies: int, seed: int, timeout: float) -> StageResult:
+    result = StageResult(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            virtual_user(client, positions, random.Random(f"{seed}:{i}"), deadline, max_plies, result)
+            for i in range(concurrency)
+        ))
+        # In-flight requests may overrun the deadline; measure the real window.
+        result.duration = time.perf_counter() - start
+    return result
+
+
+# --- Local server -----------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """Launch uvicorn with the fake engine and wait until it answers."""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "STOCKFISH_PATH": FAKE_ENGINE,
+        "FAKE_UCI_LATENCY_MS": str(args.engine_latency_ms),
+        "FAKE_UCI_JITTER_MS": str(args.engine_jitter_ms),
+        "FAKE_UCI_SEED": str(args.seed),
+        # fake_uci.py runs via its shebang; make it find this interpreter.
+        "PATH": os.path.dirname(sys.executable) + os.pathsep + env.get("PATH", ""),
+    })
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.server:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(url + "/api/positions", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become ready within 30s")
+
+
+def verify_fake_engine(url: str, seed: int) -> None:
+    """Fail unless the server's replies come from fake_uci.py.
+
+    backend.server silently falls back to its minimax when the engine cannot
+    start (lost exec bit, no python3 on PATH, ...), which would make every
+    number meaningless, so check a few replies against the fake engine's choice.
+    """
+    from backend.fake_uci import pick_move
+
+    for opening in ("e2e4", "d2d4", "g1f3"):  # several, so a chance match can't pass
+        board = chess.Board()
+        board.push_uci(opening)
+        expected, _ = pick_move(board, seed=str(seed))
+        resp = httpx.post(url + "/api/move", json={"fen": chess.STARTING_FEN, "move": opening}, timeout=30)
+        ai_move = resp.json().get("ai_move") if resp.status_code == 200 else None
+        if ai_move != expected.uci():
+            raise RuntimeError(
+                f"server replied {ai_move!r} to {opening}, fake engine would play {expected.uci()!r}: "
+                f"{FAKE_ENGINE} is not in use (is it executable and is python3 on PATH?)"
+            )
+
+
+# --- Reporting --------------------------------------------------------------
+
+def print_table(results: List[StageResult]) -> None:
+    header = (f"{'conc':>5} {'requests':>9} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>7} {'err p99':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        s = r.summary()
+        print(f"{s['concurrency']:>5} {s['requests']:>9} {s['rps']:>8.1f} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate']:>6.1%} {s['error_p99_ms']:>8.1f}")
+
+
+async def run(args: argparse.Namespace, url: str) -> List[StageResult]:
+    with open(os.path.join(BASE_DIR, "start_positions.json"), "r") as f:
+        positions = []
+        for pos in json.load(f):
+            try:
+                chess.Board(pos["fen"])
+            except ValueError as exc:
+                print(f"  skipping start position {pos['id']}: {exc}", file=sys.stderr)
+                continue
+            positions.append(pos)
+    results = []
+    for concurrency in args.concurrency:
+        result = await run_stage(url, positions, concurrency, args.duration,
+                                 args.max_plies, args.seed, args.timeout)
+        results.append(result)
+        s = result.summary()
+        print(f"  concurrency {concurrency}: {s['rps']:.1f} rps, p99 {s['p99_ms']:.1f} ms, "
+              f"{s['error_rate']:.1%} errors", file=sys.stderr)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the ChessTutor /api/move endpoint.")
+    parser.add_argument("--url", help="target an existing server instead of starting one")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")],
+                        default=[1, 2, 4, 8, 16], help="comma-separated ramp (default: 1,2,4,8,16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per stage")
+    parser.add_argument("--max-plies", type=int, default=40, help="moves per replayed game")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine-latency-ms", type=float, default=50.0, help="fake engine think time")
+    parser.add_argument("--engine-jitter-ms", type=float, default=0.0, help="fake engine +/- jitter")
+    parser.add_argument("--json", dest="json_out", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = start_server(args)
+    try:
+        if proc:
+            verify_fake_engine(url, args.seed)
+        results = asyncio.run(run(args, url))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    print_table(results)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump([r.summary() for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,14 @@ import chess
 import json
 import os
 import random
+import sys
 from typing import Optional
 from chess.engine import SimpleEngine, Limit
 
+# Shared top-level modules live next to backend/ (also when run as a script).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from material_search import search_best
+
 app = FastAPI(title="ChessTutor API", version="0.1")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
@@ -15,35 +20,6 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 with open(os.path.join(BASE_DIR, "start_positions.json"), "r") as f:
     START_POSITIONS = json.load(f)
 
-# --- Simple AI (material count depth-2) -----------------------------
-
-PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
-
-
-def eval_material(board: chess.Board) -> int:
-    score = 0
-    for pt, val in PIECE_VALUES.items():
-        score += val * (len(board.pieces(pt, chess.WHITE)) - len(board.pieces(pt, chess.BLACK)))
-    return score
-
-
-def negamax(board: chess.Board, depth: int, alpha: int, beta: int) -> int:
-    if depth == 0 or board.is_game_over():
-        ev = eval_material(board)
-        return ev if board.turn == chess.WHITE else -ev
-    best = -10_000
-    for mv in board.legal_moves:
-        board.push(mv)
-        score = -negamax(board, depth - 1, -beta, -alpha)
-        board.pop()
-        if score > best:
-            best = score
-        alpha = max(alpha, score)
-        if alpha >= beta:
-            break
-    return best
-
-
 # ---- Stockfish integration ---------------------------------------------
 
 STOCKFISH_PATH = os.getenv("STOCKFISH_PATH", "stockfish")
@@ -64,15 +40,7 @@ def choose_ai_move(board: chess.Board, depth: int = 2) -> chess.Move:
             pass  # fall back if engine errors
 
     # Fallback minimax
-    best_move = None
-    best_score = -10_000
-    for mv in board.legal_moves:
-        board.push(mv)
-        score = -negamax(board, depth - 1, -10_000, 10_000)
-        board.pop()
-        if score > best_score:
-            best_score = score
-            best_move = mv
+    _, best_move = search_best(board, depth)
     return best_move or random.choice(list(board.legal_moves))
 
 
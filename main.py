@@ -7,6 +7,8 @@ import os
 from typing import Optional
 import json
 from menu import PositionMenu
+from material_search import search_best
+import profiler
 
 # --- Constants --------------------------------------------------------------
 BOARD_SIZE = 640  # Pixels (square board)
@@ -201,45 +203,6 @@ def draw_board(screen, board, piece_images: dict[str, pygame.Surface], selected_
 
 # --- AI helper --------------------------------------------------------------
 
-PIECE_VALUES = {
-    chess.PAWN: 100,
-    chess.KNIGHT: 320,
-    chess.BISHOP: 330,
-    chess.ROOK: 500,
-    chess.QUEEN: 900,
-    chess.KING: 0,
-}
-
-
-def evaluate_material(board: chess.Board) -> int:
-    """Simple material count from White perspective (centipawns)."""
-    score = 0
-    for piece_type in PIECE_VALUES:
-        score += PIECE_VALUES[piece_type] * (
-            len(board.pieces(piece_type, chess.WHITE)) - len(board.pieces(piece_type, chess.BLACK))
-        )
-    return score
-
-
-def negamax(board: chess.Board, depth: int, alpha: int, beta: int) -> int:
-    """Negamax search with alpha-beta pruning."""
-    if depth == 0 or board.is_game_over():
-        eval_score = evaluate_material(board)
-        return eval_score if board.turn == chess.WHITE else -eval_score
-
-    max_eval = -10_000
-    for move in board.legal_moves:
-        board.push(move)
-        score = -negamax(board, depth - 1, -beta, -alpha)
-        board.pop()
-        if score > max_eval:
-            max_eval = score
-        alpha = max(alpha, score)
-        if alpha >= beta:
-            break
-    return max_eval
-
-
 # Try to load Stockfish: expects binary named "stockfish" in PATH.
 try:
     from chess.engine import SimpleEngine, Limit
@@ -262,18 +225,31 @@ def choose_ai_move(board: chess.Board, depth: int = 2) -> chess.Move:
             pass  # If engine fails, fall back
 
     # Fallback minimax
-    best_move = None
-    best_score = -10_000
-    for move in board.legal_moves:
-        board.push(move)
-        score = -negamax(board, depth - 1, -10_000, 10_000)
-        board.pop()
-        if score > best_score:
-            best_score = score
-            best_move = move
+    _, best_move = search_best(board, depth)
     return best_move if best_move else random.choice(list(board.legal_moves))
 
 
+# --- Profiling (opt-in via CHESS_PROFILE) ------------------------------------
+
+def enable_profiling() -> None:
+    """Wrap the expensive stages with timers if CHESS_PROFILE is set."""
+    prof = profiler.from_env(FPS)
+    if not prof:
+        return
+    import gfx
+    import menu
+
+    this = sys.modules[__name__]
+    prof.instrument(this, "draw_board")
+    prof.instrument(this, "choose_ai_move")
+    prof.instrument(PositionMenu, "_draw", "PositionMenu._draw")
+    prof.instrument(PositionMenu, "_handle_events", "PositionMenu._handle_events")
+    # menu.py imported load_svg by name, so patch both references.
+    prof.instrument(gfx, "load_svg", "gfx.load_svg")
+    prof.instrument(menu, "load_svg", "gfx.load_svg")
+    prof.install()
+
+
 # --- Main game loop ---------------------------------------------------------
 
 def main():
@@ -283,6 +259,7 @@ def main():
 
     # Open graphical menu before game starts
     pygame.init()
+    enable_profiling()
     screen = pygame.display.set_mode((BOARD_SIZE, BOARD_SIZE + STATUS_BAR_HEIGHT))
     pygame.display.set_caption("Chess Tutor – MVP")
 
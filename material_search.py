@@ -0,0 +1,65 @@
+"""Material-count minimax shared by the desktop client, the API and the PGN analyser.
+
+Deliberately free of pygame / FastAPI imports so every entry point can use it.
+"""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import chess
+
+MATE_SCORE = 10_000
+
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+
+
+def evaluate_material(board: chess.Board) -> int:
+    """Simple material count from White perspective (centipawns)."""
+    score = 0
+    for piece_type, value in PIECE_VALUES.items():
+        score += value * (
+            len(board.pieces(piece_type, chess.WHITE)) - len(board.pieces(piece_type, chess.BLACK))
+        )
+    return score
+
+
+def negamax(board: chess.Board, depth: int, alpha: int, beta: int) -> int:
+    """Negamax search with alpha-beta pruning (score for side to move)."""
+    if board.is_checkmate():
+        return -MATE_SCORE
+    if depth == 0 or board.is_game_over():
+        eval_score = evaluate_material(board)
+        return eval_score if board.turn == chess.WHITE else -eval_score
+
+    max_eval = -MATE_SCORE
+    for move in board.legal_moves:
+        board.push(move)
+        score = -negamax(board, depth - 1, -beta, -alpha)
+        board.pop()
+        if score > max_eval:
+            max_eval = score
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    return max_eval
+
+
+def search_best(board: chess.Board, depth: int) -> Tuple[int, Optional[chess.Move]]:
+    """Return (score, best move) for the side to move; move is None if there are none."""
+    best_move = None
+    best_score = -MATE_SCORE - 1
+    for move in board.legal_moves:
+        board.push(move)
+        score = -negamax(board, depth - 1, -MATE_SCORE - 1, MATE_SCORE + 1)
+        board.pop()
+        if score > best_score:
+            best_score = score
+            best_move = move
+    return best_score, best_move
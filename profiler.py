@@ -0,0 +1,186 @@
+"""Opt-in per-frame profiler with on-screen overlay and Chrome-trace export.
+
+Enable with ``CHESS_PROFILE=trace.json python main.py`` (``CHESS_PROFILE=1``
+writes ``chess_trace.json``).  Open the file in chrome://tracing or Perfetto.
+
+When disabled nothing is patched, so the game loops run untouched.  When
+enabled, selected functions are wrapped with timers and ``pygame.display.flip``
+marks frame boundaries: right before each flip the overlay (frame-time graph +
+per-stage breakdown) is drawn on top of whatever the active loop rendered.
+
+``Clock.tick`` is timed separately as idle time: the graph and the breakdown
+show *busy* time (frame minus tick), so a stutter is not hidden in, or faked
+by, the frame-rate limiter's sleep.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+import pygame
+
+GRAPH_FRAMES = 120        # frames shown in the graph
+AVERAGE_FRAMES = 30       # frames averaged for the stage breakdown
+MAX_TRACE_EVENTS = 500_000
+OVERLAY_BG = (0, 0, 0, 170)
+GRAPH_OK = (106, 246, 105)
+GRAPH_SLOW = (255, 80, 60)
+TEXT_COLOR = (248, 248, 248)
+FONT_SIZE = 16
+TICK = "tick (idle)"
+
+
+class FrameProfiler:
+    """Collects stage timings per frame and renders them as an overlay."""
+
+    def __init__(self, trace_path: str, target_fps: int = 30):
+        self.trace_path = trace_path
+        self.budget_ms = 1000 / target_fps
+        self.events: Deque[Dict] = deque(maxlen=MAX_TRACE_EVENTS)
+        self.frame_times: Deque[float] = deque(maxlen=GRAPH_FRAMES)
+        self.busy_times: Deque[float] = deque(maxlen=GRAPH_FRAMES)
+        self.history: Deque[Dict[str, float]] = deque(maxlen=AVERAGE_FRAMES)
+        self._origin = time.perf_counter_ns()
+        self._frame_start = self._origin
+        self._current: Dict[str, float] = {}  # stage -> ms in the current frame
+        self._depth = 0
+        self._font: Optional[pygame.font.Font] = None
+
+    # ---------------------------------------------------------------------
+    def instrument(self, owner, name: str, label: Optional[str] = None) -> None:
+        """Replace ``owner.name`` with a timed wrapper recorded as `label`."""
+        func = getattr(owner, name)
+        setattr(owner, name, self._timed(func, label or name))
+
+    def install(self) -> None:
+        """Hook frame boundaries and the trace dump on exit."""
+        self.instrument(pygame.event, "get", "events")
+        draw_overlay = self._timed(self._draw_overlay, "overlay")
+        real_flip = self._timed(pygame.display.flip, "flip")
+
+        def flip():
+            # Overlay and flip are attributed to the frame that starts here.
+            self._end_frame()
+            draw_overlay()
+            real_flip()
+
+        pygame.display.flip = flip
+
+        # Clock is a C type that cannot be subclassed, so wrap instances created
+        # from now on (both loops build theirs after profiling is enabled).
+        real_clock = pygame.time.Clock
+        timed_tick = self._timed(lambda clock, framerate: clock.tick(framerate), TICK)
+
+        class Clock:
+            def __init__(self):
+                self._clock = real_clock()
+
+            def tick(self, framerate: int = 0) -> int:
+                return timed_tick(self._clock, framerate)
+
+            def __getattr__(self, name):
+                return getattr(self._clock, name)
+
+        pygame.time.Clock = Clock
+        atexit.register(self.dump)
+
+    # ---------------------------------------------------------------------
+    def _timed(self, func: Callable, label: str) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            top_level = self._depth == 0
+            self._depth += 1
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                self._record(label, start, time.perf_counter_ns(), top_level)
+        return wrapper
+
+    def _record(self, label: str, start: int, end: int, top_level: bool) -> None:
+        self.events.append({
+            "name": label, "cat": "stage", "ph": "X", "pid": 1, "tid": 1,
+            "ts": (start - self._origin) / 1000, "dur": (end - start) / 1000,
+        })
+        key = label if top_level else "  " + label  # nested stages are indented, not summed
+        self._current[key] = self._current.get(key, 0.0) + (end - start) / 1e6
+
+    def _end_frame(self) -> None:
+        now = time.perf_counter_ns()
+        frame_ms = (now - self._frame_start) / 1e6
+        loop = "menu" if "PositionMenu._draw" in self._current else "main"
+        stages = self._current
+        busy_ms = max(0.0, frame_ms - stages.get(TICK, 0.0))
+        self.events.append({
+            "name": f"frame ({loop})", "cat": "frame", "ph": "X", "pid": 1, "tid": 0,
+            "ts": (self._frame_start - self._origin) / 1000, "dur": frame_ms * 1000,
+            "args": {"busy_ms": busy_ms},
+        })
+        accounted = sum(ms for key, ms in stages.items() if not key.startswith(" ") and key != TICK)
+        stages["other"] = max(0.0, busy_ms - accounted)
+        self.frame_times.append(frame_ms)
+        self.busy_times.append(busy_ms)
+        self.history.append(stages)
+        self._current = {}
+        self._frame_start = now
+
+    # ---------------------------------------------------------------------
+    def _draw_overlay(self) -> None:
+        screen = pygame.display.get_surface()
+        if screen is None or not self.frame_times:
+            return
+        if self._font is None:
+            pygame.font.init()
+            self._font = pygame.font.Font(None, FONT_SIZE)
+
+        averages: Dict[str, float] = {}
+        for frame in self.history:
+            for key, ms in frame.items():
+                averages[key] = averages.get(key, 0.0) + ms / len(self.history)
+        idle = averages.pop(TICK, 0.0)
+        lines = [f"busy {sum(self.busy_times) / len(self.busy_times):5.1f} ms  "
+                 f"max {max(self.busy_times):5.1f} ms",
+                 f"frame {sum(self.frame_times) / len(self.frame_times):5.1f} ms"]
+        lines += [f"{key:<22}{ms:6.2f}" for key, ms in averages.items()]
+        lines.append(f"{TICK:<22}{idle:6.2f}")
+
+        graph_h = 50
+        width = GRAPH_FRAMES * 2
+        height = graph_h + 6 + len(lines) * FONT_SIZE
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BG)
+
+        # Busy-time bars, scaled so twice the budget fills the graph.
+        scale = graph_h / (2 * self.budget_ms)
+        for i, ms in enumerate(self.busy_times):
+            bar = min(graph_h, int(ms * scale))
+            color = GRAPH_OK if ms <= self.budget_ms else GRAPH_SLOW
+            pygame.draw.rect(panel, color, (i * 2, graph_h - bar, 2, bar))
+        budget_y = graph_h - int(self.budget_ms * scale)
+        pygame.draw.line(panel, TEXT_COLOR, (0, budget_y), (width, budget_y))
+
+        y = graph_h + 4
+        for line in lines:
+            panel.blit(self._font.render(line, True, TEXT_COLOR), (4, y))
+            y += FONT_SIZE
+        screen.blit(panel, (screen.get_width() - width, 0))
+
+    def dump(self) -> None:
+        """Write all collected events as Chrome-trace JSON."""
+        with open(self.trace_path, "w") as f:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, f)
+        print(f"Profile trace written to {self.trace_path}")
+
+
+def from_env(target_fps: int = 30) -> Optional[FrameProfiler]:
+    """Return a profiler if ``CHESS_PROFILE`` is set, else None."""
+    value = os.getenv("CHESS_PROFILE")
+    if not value or value == "0":
+        return None
+    return FrameProfiler("chess_trace.json" if value == "1" else value, target_fps)